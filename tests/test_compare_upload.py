@@ -0,0 +1,206 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+import compare_upload
+from compare_upload import compare_sheets
+
+
+def diff_cells(df_left, df_right, tol=0.0, ignore_case=False):
+    diffs, summary = compare_sheets(df_left, df_right, "Sheet1", tol=tol, ignore_case=ignore_case)
+    cells = [(int(r), str(c)) for r, c in zip(diffs["row_index"], diffs["column"])]
+    assert summary["diff_count"] == len(cells)
+    return cells
+
+
+def test_bool_against_number_is_a_difference():
+    # A bool column is compared as text, so True vs 1 differs
+    left = pd.DataFrame({"a": [True, False], "b": ["x", "y"]})
+    right = pd.DataFrame({"a": [1, 5], "b": ["x", "y"]})
+    assert diff_cells(left, right) == [(0, "a"), (1, "a")]
+
+
+def test_unrelated_change_does_not_affect_other_cells():
+    # Changing b in row 0 must not change how column a is reported
+    left = pd.DataFrame({"a": [True, False], "b": ["x", "y"]})
+    right = pd.DataFrame({"a": [1, 5], "b": ["CHANGED", "y"]})
+    assert diff_cells(left, right) == [(0, "a"), (0, "b"), (1, "a")]
+
+
+def test_datetime_against_text_is_a_difference():
+    left = pd.DataFrame({"d": pd.to_datetime(["2020-01-01", "2021-02-03"]), "b": ["x", "y"]})
+    right = pd.DataFrame({"d": ["2020-01-01", "2021-02-03"], "b": ["CHANGED", "y"]})
+    assert diff_cells(left, right) == [(0, "b"), (0, "d"), (1, "d")]
+
+
+def test_numbers_stored_as_text_are_not_merged():
+    left = pd.DataFrame({"n": ["4111111111111111111", "00123", "1e3", "1001"]})
+    right = pd.DataFrame({"n": ["4111111111111111112", "123", "1000", "1002"]})
+    assert diff_cells(left, right, tol=1.0) == [(0, "n"), (1, "n"), (2, "n"), (3, "n")]
+
+
+def test_all_numeric_text_columns_compare_as_text():
+    left = pd.DataFrame({"n": ["1001", "2.50"]})
+    right = pd.DataFrame({"n": ["1002", "2.5"]})
+    assert diff_cells(left, right, tol=1.0) == [(0, "n"), (1, "n")]
+
+
+def test_text_number_against_real_number_uses_tolerance():
+    left = pd.DataFrame({"n": ["1001", "2.5", "00123"]})
+    right = pd.DataFrame({"n": [1002.0, 2.5, 123.0]})
+    assert diff_cells(left, right, tol=1.0) == [(2, "n")]
+
+
+def test_bool_in_mixed_column_against_number_text_is_a_difference():
+    left = pd.DataFrame({"a": pd.Series([True, "x", False], dtype=object)})
+    right = pd.DataFrame({"a": ["1", "x", "0"]})
+    assert diff_cells(left, right) == [(0, "a"), (2, "a")]
+
+
+def diff_rows(df_left, df_right, tol=0.0, ignore_case=False):
+    diffs, _ = compare_sheets(df_left, df_right, "Sheet1", tol=tol, ignore_case=ignore_case)
+    return list(zip(
+        diffs["row_index"].tolist(), diffs["excel_row"].tolist(), diffs["column"].tolist(),
+        diffs["left_value"].tolist(), diffs["right_value"].tolist()
+    ))
+
+
+def test_extra_rows_on_left_are_reported_with_missing_right_value():
+    left = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    right = pd.DataFrame({"a": [1], "b": ["x"]})
+    rows = diff_rows(left, right)
+    assert [r[:4] for r in rows] == [(1, 2, "a", 2), (1, 2, "b", "y"), (2, 3, "a", 3), (2, 3, "b", "z")]
+    assert all(pd.isna(r[4]) for r in rows)
+
+
+def test_extra_rows_on_right_are_reported_with_missing_left_value():
+    left = pd.DataFrame({"a": [1]})
+    right = pd.DataFrame({"a": [1, 5]})
+    rows = diff_rows(left, right)
+    assert [(r[0], r[2], r[4]) for r in rows] == [(1, "a", 5)]
+    assert pd.isna(rows[0][3])
+
+
+def test_column_on_one_side_only_is_reported():
+    left = pd.DataFrame({"a": [1, 2], "only_left": ["p", None]})
+    right = pd.DataFrame({"a": [1, 2], "only_right": [None, 7]})
+    rows = diff_rows(left, right)
+    assert [(r[0], r[2]) for r in rows] == [(0, "only_left"), (1, "only_right")]
+    assert rows[0][3] == "p" and pd.isna(rows[0][4])
+    assert pd.isna(rows[1][3]) and rows[1][4] == 7
+
+
+def test_blank_text_in_extra_rows_is_not_reported():
+    left = pd.DataFrame({"a": ["x", "", "   ", None]})
+    right = pd.DataFrame({"a": ["x"]})
+    assert diff_cells(left, right) == []
+
+
+def test_shared_and_one_side_cells_are_reported_row_by_row():
+    left = pd.DataFrame({"a": [1, 2, 3], "c": ["p", "q", "r"]})
+    right = pd.DataFrame({"a": [9, 2], "b": ["s", "t"], "c": ["p", "Q"]})
+    assert diff_cells(left, right) == [
+        (0, "a"), (0, "b"),
+        (1, "b"), (1, "c"),
+        (2, "a"), (2, "c"),
+    ]
+
+
+def test_row_blocks_match_a_single_block(monkeypatch):
+    left = pd.DataFrame({
+        "num": [1.0, 2.0, np.nan, 4.0, 5.0, np.nan, 7.0],
+        "text": ["a", "b", "c", None, "e", "f", "g"],
+        "as_text": ["1", "2", "3", "4", None, "6", "7"],
+        "mixed": pd.Series([1, "x", "2", None, 3.5, "y", 4], dtype=object),
+        "when": pd.to_datetime(["2020-01-01", "2020-01-02", None, None, "2020-01-05", None, "2020-01-07"]),
+    })
+    right = pd.DataFrame({
+        "num": [1.0, 2.5, np.nan, 4.0, np.nan, np.nan, 7.5],
+        "text": ["a", "B", "c", None, "e", "F", "x"],
+        "as_text": [1.0, 2.0, 4.0, 4.0, None, 6.5, 7.0],
+        "mixed": pd.Series(["1", "x", 2.0, None, 3.0, "Y", "4"], dtype=object),
+        "when": pd.to_datetime(["2020-01-01", "2021-01-02", None, None, "2020-01-05", "2020-01-06", None]),
+    })
+    expected = diff_rows(left, right, tol=0.25, ignore_case=True)
+    assert expected
+    monkeypatch.setattr(compare_upload, "DIFF_TILE_ROWS", 2)
+    assert repr(diff_rows(left, right, tol=0.25, ignore_case=True)) == repr(expected)
+
+
+def workbook(sheets):
+    out = io.BytesIO()
+    with pd.ExcelWriter(out, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return out.getvalue()
+
+
+def post_workbooks(left, right, **form):
+    client = compare_upload.app.test_client()
+    data = {"left": (io.BytesIO(left), "left.xlsx"), "right": (io.BytesIO(right), "right.xlsx"), **form}
+    response = client.post("/", data=data, content_type="multipart/form-data")
+    assert response.status_code == 200
+    return response
+
+
+LEFT_BOOK = {
+    "S1": pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}),
+    "S2": pd.DataFrame({"n": [1.0, 2.0]}),
+    "OnlyL": pd.DataFrame({"q": [1]}),
+}
+RIGHT_BOOK = {
+    "S1": pd.DataFrame({"a": [1, 5, 3], "b": ["x", "Y", "z"]}),
+    "S2": pd.DataFrame({"n": [1.0, 2.5]}),
+    "OnlyR": pd.DataFrame({"q": [1]}),
+}
+
+
+def test_upload_reports_differences_and_summary():
+    response = post_workbooks(workbook(LEFT_BOOK), workbook(RIGHT_BOOK), ignore_case="on")
+    result = pd.read_excel(io.BytesIO(response.data), sheet_name=None)
+    assert list(result) == ["differences", "summary"]
+
+    differences = result["differences"]
+    assert list(differences.columns) == list(compare_upload.DIFF_COLUMNS)
+    assert differences[["sheet", "row_index", "excel_row", "column"]].values.tolist() == [
+        ["S1", 1, 2, "a"],
+        ["S2", 1, 2, "n"],
+    ]
+    assert differences["left_value"].tolist() == [2, 2]
+    assert differences["right_value"].tolist() == [5, 2.5]
+
+    summary = result["summary"]
+    assert summary["sheet"].tolist() == ["OnlyL", "OnlyR", "S1", "S2"]
+    assert summary["note"].fillna("").tolist() == ["only_in_left", "only_in_right", "", ""]
+    assert summary["diff_count"].fillna(-1).tolist() == [-1, -1, 1, 1]
+    assert summary["left_rows"].fillna(-1).tolist() == [-1, -1, 3, 2]
+
+
+def test_upload_compares_requested_sheets_in_order():
+    # Duplicates are compared each time they are named; unknown names are ignored
+    response = post_workbooks(workbook(LEFT_BOOK), workbook(RIGHT_BOOK), sheets="S2, S1,S2,OnlyR,Nope")
+    result = pd.read_excel(io.BytesIO(response.data), sheet_name=None)
+
+    differences = result["differences"]
+    assert differences[["sheet", "row_index", "column"]].values.tolist() == [
+        ["S2", 1, "n"],
+        ["S1", 1, "a"],
+        ["S1", 1, "b"],
+        ["S2", 1, "n"],
+    ]
+    summary = result["summary"]
+    assert summary["sheet"].tolist() == ["S2", "S1", "S2", "OnlyR"]
+    assert summary["note"].fillna("").tolist() == ["", "", "", "only_in_right"]
+
+
+def test_upload_without_differences_writes_a_note():
+    response = post_workbooks(workbook(LEFT_BOOK), workbook(LEFT_BOOK), sheets="S1")
+    result = pd.read_excel(io.BytesIO(response.data), sheet_name=None)
+    assert result["differences"].to_dict("records") == [{"note": "no differences found"}]
+    assert result["summary"]["diff_count"].tolist() == [0]
+
+
+def test_upload_with_no_known_sheets_shows_the_form_again():
+    response = post_workbooks(workbook(LEFT_BOOK), workbook(RIGHT_BOOK), sheets="Nope")
+    assert b"No requested sheets found in either file." in response.data